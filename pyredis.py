@@ -9,14 +9,228 @@ that supports basic Redis commands and data types.
 """
 
 import socket
+import selectors
 import threading
 import time
 import json
 import re
-from typing import Dict, List, Any, Optional, Union
-from collections import defaultdict
+import dataclasses
+from typing import Dict, List, Any, Iterable, Optional, Union
+from collections import defaultdict, deque
+from itertools import chain, islice
 import heapq
 
+try:
+    import hiredis  # Optional C RESP parser
+except ImportError:
+    hiredis = None
+
+
+RECV_BUFFER_SIZE = 65536  # Initial size of each connection's receive buffer
+RECV_MIN_FREE = 16384  # Free space wanted before a read; less triggers compaction or growth
+COMPACT_THRESHOLD = 65536  # Parsed bytes allowed to pile up before compacting
+BULK_DIRECT_THRESHOLD = 32768  # Bulk strings this long are received straight into their own buffer
+MAX_LINE_LEN = 65536  # Longest inline command or header line, as Redis' inline limit
+MAX_BULK_LEN = 512 * 1024 * 1024  # Longest bulk string a client may send, as Redis' proto-max-bulk-len
+OUTPUT_BUFFER_LIMIT = 1024 * 1024  # Pending reply bytes at which a client's commands stop being run
+
+# Commands that store every argument after the key without hashing it, so a
+# large argument can be handed over as the bytearray it was received into
+DIRECT_BULK_COMMANDS = frozenset({b'SET', b'LPUSH', b'RPUSH'})
+NUM_SHARDS = 16  # Keyspace shards, each with its own lock; must be a power of two
+
+# Type tags for stored values; each key maps to a (type_tag, payload) tuple
+TYPE_STR = 0
+TYPE_LIST = 1
+TYPE_SET = 2
+TYPE_HASH = 3
+
+# Preencoded replies returned on the hot paths
+RESP_OK = b"+OK\r\n"
+RESP_PONG = b"+PONG\r\n"
+RESP_NIL = b"$-1\r\n"
+RESP_ZERO = b":0\r\n"
+RESP_ONE = b":1\r\n"
+RESP_MINUS_ONE = b":-1\r\n"
+RESP_MINUS_TWO = b":-2\r\n"
+RESP_EMPTY_ARRAY = b"*0\r\n"
+RESP_WRONGTYPE = b"-ERR WRONGTYPE Operation against a key holding the wrong kind of value\r\n"
+RESP_NOT_INTEGER = b"-ERR value is not an integer or out of range\r\n"
+RESP_ERR_WRONG_ARGS = {
+    name: b"-ERR wrong number of arguments for '%s' command\r\n" % name
+    for name in (
+        b'set', b'get', b'del', b'exists', b'incr', b'decr', b'lpush', b'rpush',
+        b'lpop', b'rpop', b'llen', b'lrange', b'sadd', b'srem', b'smembers', b'scard',
+        b'sismember', b'hset', b'hget', b'hdel', b'hkeys', b'hvals', b'hgetall',
+        b'expire', b'ttl', b'keys',
+    )
+}
+RESP_INT = [b":%d\r\n" % i for i in range(256)]  # Small integer replies
+INT_BYTES_SIZE = 4096  # Bulk lengths below this are formatted from INT_BYTES
+INT_BYTES = [b"%d" % i for i in range(INT_BYTES_SIZE)]  # Decimal forms of common bulk lengths
+
+
+def int_reply(value: int) -> bytes:
+    """Encode an integer reply, reusing the cached bytes for small values."""
+    if 0 <= value < 256:
+        return RESP_INT[value]
+    return b":%d\r\n" % value
+
+
+def bulk_reply(value: bytes) -> bytes:
+    """Encode a value as a length-prefixed bulk string."""
+    length = len(value)
+    if length < INT_BYTES_SIZE:
+        return b"$%s\r\n%s\r\n" % (INT_BYTES[length], value)
+    return b"$%d\r\n%s\r\n" % (length, value)
+
+
+def array_reply(items: Iterable[bytes], count: int) -> bytes:
+    """
+    Encode ``count`` values as an array of bulk strings with a single join.
+
+    ``items`` is iterated once, so containers can be passed directly
+    instead of being copied into a list first. Callers hold the shard
+    lock while doing so, since writers take it too and a container must
+    not change size while it is iterated.
+    """
+    parts = [b"*%d\r\n" % count]
+    parts.extend(map(bulk_reply, items))
+    return b''.join(parts)
+
+
+def compile_glob(pattern: bytes) -> 're.Pattern[bytes]':
+    """
+    Compile a Redis glob pattern into a regex matching whole keys.
+
+    Supports ``*``, ``?``, ``[...]`` classes with ranges and ``^`` (or
+    ``!``) negation, and ``\\x`` escapes, following Redis' stringmatch
+    rather than fnmatch.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i:i + 1]
+        i += 1
+        if c == b'*':
+            out.append(b'.*')
+        elif c == b'?':
+            out.append(b'.')
+        elif c == b'\\' and i < n:
+            out.append(re.escape(pattern[i:i + 1]))
+            i += 1
+        elif c == b'[':
+            negate = i < n and pattern[i] in b'^!'
+            if negate:
+                i += 1
+            members = []
+            # As in Redis, an unterminated class runs to the end of the pattern
+            while i < n and pattern[i] != 0x5D:  # ']'
+                if pattern[i] == 0x5C and i + 1 < n:  # '\\'
+                    i += 1
+                if i + 2 < n and pattern[i + 1] == 0x2D and pattern[i + 2] != 0x5D:  # 'a-z'
+                    low, high = sorted(pattern[i:i + 3:2])
+                    members.append(re.escape(bytes([low])) + b'-' + re.escape(bytes([high])))
+                    i += 3
+                else:
+                    members.append(re.escape(pattern[i:i + 1]))
+                    i += 1
+            i += 1  # Skip the closing ']'
+            if members:
+                out.append(b'[%s%s]' % (b'^' if negate else b'', b''.join(members)))
+            else:
+                out.append(b'.' if negate else b'(?!)')
+        else:
+            out.append(re.escape(c))
+    return re.compile(b'(?s:%s)\\Z' % b''.join(out))
+
+
+class ProtocolError(Exception):
+    """Raised when a client sends malformed RESP."""
+
+
+@dataclasses.dataclass
+class ConnectionState:
+    """
+    Receive buffer and resumable RESP parser state for one connection.
+
+    ``buf[pos:end]`` holds input that has not been parsed yet. A command
+    that is only partially received keeps its progress in ``argc``,
+    ``argv`` and ``expected_len``, so the next read resumes parsing where
+    the previous one stopped instead of rescanning the prefix.
+    """
+    buf: bytearray = dataclasses.field(default_factory=lambda: bytearray(RECV_BUFFER_SIZE))
+    pos: int = 0  # Start of unparsed input
+    end: int = 0  # End of received input
+    argc: Optional[int] = None  # Arguments in the command being parsed
+    argv: List[bytes] = dataclasses.field(default_factory=list)  # Arguments parsed so far
+    expected_len: Optional[int] = None  # Length of the pending bulk string
+    bulk_target: Optional[bytearray] = None  # Destination of a large bulk string being received
+    bulk_written: int = 0  # Bytes of bulk_target filled so far
+    multibulk: bool = False  # Set by the first multi-bulk request; inline commands are rejected after it
+    reader: Any = None  # hiredis.Reader parsing this connection after its first multi-bulk request
+    reader_fed: int = 0  # Bytes fed to reader since it last returned a command
+
+    def reserve(self, size: int):
+        """Make room for at least ``size`` more bytes after ``end``."""
+        if self.pos == self.end:
+            # Everything has been parsed, so the buffer can be reused from the start
+            self.pos = self.end = 0
+            if len(self.buf) > RECV_BUFFER_SIZE:
+                self.buf = bytearray(RECV_BUFFER_SIZE)
+        elif self.pos > COMPACT_THRESHOLD or len(self.buf) - self.end < size:
+            # Drop the parsed prefix once it is large enough to be worth the
+            # move, or when that is the only way to avoid growing the buffer
+            remaining = self.end - self.pos
+            self.buf[:remaining] = self.buf[self.pos:self.end]
+            self.pos = 0
+            self.end = remaining
+
+        free = len(self.buf) - self.end
+        if free < size:
+            self.buf.extend(bytes(max(size - free, RECV_BUFFER_SIZE)))
+
+    def recv_from(self, sock) -> int:
+        """
+        Read from a socket straight into the free tail of the buffer.
+
+        While a large bulk string is pending, reads go directly into its
+        own buffer instead. Returns the number of bytes received, 0 once
+        the peer has closed.
+        """
+        if self.reader is not None:
+            # hiredis keeps its own buffer, so ours is only a landing area
+            n = sock.recv_into(self.buf)
+            self.reader.feed(self.buf, 0, n)
+            self.reader_fed += n
+            return n
+
+        target = self.bulk_target
+        if target is not None and self.bulk_written < len(target):
+            n = sock.recv_into(memoryview(target)[self.bulk_written:])
+            self.bulk_written += n
+            return n
+
+        self.reserve(RECV_MIN_FREE)
+        n = sock.recv_into(memoryview(self.buf)[self.end:])
+        self.end += n
+        return n
+
+
+class ClientConnection:
+    """
+    Per-client state for the event loop: the socket, its parser state
+    and any reply bytes still waiting to be written.
+    """
+
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.state = ConnectionState()
+        self.out_buf = bytearray()
+        self.events = selectors.EVENT_READ
+        self.pending = False  # Commands may be left unrun because out_buf hit OUTPUT_BUFFER_LIMIT
+
 
 class PyRedisServer:
     """
@@ -31,65 +245,211 @@ class PyRedisServer:
     - General: KEYS, FLUSHALL, PING
     """
 
-    def __init__(self, host='localhost', port=6379):
+    def __init__(self, host='localhost', port=6379, threaded=False):
         self.host = host
         self.port = port
-        self.data = {}  # Main data storage
-        self.expiry = {}  # Key expiration timestamps
-        self.lock = threading.RLock()  # Thread-safe operations
+        self.threaded = threaded  # Use one thread per client instead of the event loop
+        # Keys are spread over shards, each holding its own data, expiry times,
+        # (expire_at, key) min-heap (which may hold stale entries) and lock
+        self._shards = [
+            {'data': {}, 'expiry': {}, 'heap': [], 'lock': threading.RLock()}
+            for _ in range(NUM_SHARDS)
+        ]
+        self._expiry_wakeup = threading.Event()  # Set when the earliest expiry moves forward
         self.running = False
         self.server_socket = None
+        self.selector = None
 
     def start(self):
         """Start the PyRedis server."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(128)
         self.running = True
 
         print(f"PyRedis server started on {self.host}:{self.port}")
 
+        try:
+            if self.threaded:
+                self._serve_threaded()
+            else:
+                self._serve_event_loop()
+        except KeyboardInterrupt:
+            print("\nShutting down PyRedis server...")
+        finally:
+            self.stop()
+
+    def _serve_threaded(self):
+        """Accept clients and serve each one from its own thread."""
         # Start expiry cleanup thread
         cleanup_thread = threading.Thread(target=self._cleanup_expired_keys, daemon=True)
         cleanup_thread.start()
 
+        while self.running:
+            try:
+                client_socket, addr = self.server_socket.accept()
+                client_thread = threading.Thread(
+                    target=self._handle_client,
+                    args=(client_socket, addr),
+                    daemon=True
+                )
+                client_thread.start()
+            except OSError:
+                if self.running:
+                    raise
+
+    def _serve_event_loop(self):
+        """
+        Serve all clients from a single thread with non-blocking sockets.
+
+        Expired keys are swept from the loop itself, so no other thread
+        touches the data while the event loop is running.
+        """
+        self.server_socket.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ, None)
+
         try:
             while self.running:
-                try:
-                    client_socket, addr = self.server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, addr),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except OSError:
-                    if self.running:
-                        raise
-        except KeyboardInterrupt:
-            print("\nShutting down PyRedis server...")
+                # Sleep until the next key is due, waking at least once a second to notice stop()
+                delay = self._sweep_expired_keys()
+                timeout = 1.0 if delay is None else min(delay, 1.0)
+                for key, events in self.selector.select(timeout):
+                    if key.data is None:
+                        self._accept()
+                        continue
+
+                    conn = key.data
+                    if events & selectors.EVENT_READ:
+                        self._on_readable(conn)
+                    if events & selectors.EVENT_WRITE and conn.sock.fileno() != -1:
+                        self._on_writable(conn)
         finally:
-            self.stop()
+            for key in list(self.selector.get_map().values()):
+                if key.data is not None:
+                    key.data.sock.close()
+            self.selector.close()
+
+    def _accept(self):
+        """Accept a pending connection and register it with the selector."""
+        try:
+            client_socket, addr = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        except OSError:
+            if self.running:
+                raise
+            return
+
+        client_socket.setblocking(False)
+        print(f"Client connected from {addr}")
+        conn = ClientConnection(client_socket, addr)
+        self.selector.register(client_socket, selectors.EVENT_READ, conn)
+
+    def _on_readable(self, conn: ClientConnection):
+        """Read from a client and run every complete command received."""
+        state = conn.state
+
+        try:
+            n = state.recv_from(conn.sock)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._close_connection(conn)
+            return
+
+        if n == 0:
+            self._close_connection(conn)
+            return
+
+        self._serve_pending(conn)
+
+    def _on_writable(self, conn: ClientConnection):
+        """Send pending output, then run commands held back by the output limit."""
+        self._flush(conn)
+        if conn.pending and conn.sock.fileno() != -1 and len(conn.out_buf) < OUTPUT_BUFFER_LIMIT:
+            self._serve_pending(conn)
+
+    def _serve_pending(self, conn: ClientConnection):
+        """Run a client's buffered commands and start sending their replies."""
+        try:
+            conn.pending = self._execute_pending(conn.state, conn.out_buf)
+        except ProtocolError as e:
+            conn.out_buf += f"-ERR Protocol error: {e}\r\n".encode('utf-8')
+            self._flush(conn)
+            if conn.sock.fileno() != -1:
+                self._close_connection(conn)
+            return
+        except Exception as e:
+            # Drop only this client; the loop keeps serving everyone else
+            print(f"Error handling client {conn.addr}: {e}")
+            self._close_connection(conn)
+            return
+
+        if conn.out_buf or conn.events != selectors.EVENT_READ:
+            self._flush(conn)
+
+    def _flush(self, conn: ClientConnection):
+        """Write as much pending output as the socket accepts."""
+        try:
+            sent = conn.sock.send(conn.out_buf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._close_connection(conn)
+            return
+
+        del conn.out_buf[:sent]
+
+        if conn.pending or len(conn.out_buf) >= OUTPUT_BUFFER_LIMIT:
+            # Stop reading a client that is not keeping up with its replies
+            events = selectors.EVENT_WRITE
+        elif conn.out_buf:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        else:
+            events = selectors.EVENT_READ
+        if events != conn.events:
+            self.selector.modify(conn.sock, events, conn)
+            conn.events = events
+
+    def _close_connection(self, conn: ClientConnection):
+        """Unregister and close a client socket."""
+        self.selector.unregister(conn.sock)
+        conn.sock.close()
+        print(f"Client {conn.addr} disconnected")
 
     def stop(self):
         """Stop the PyRedis server."""
         self.running = False
+        self._expiry_wakeup.set()
         if self.server_socket:
             self.server_socket.close()
 
     def _handle_client(self, client_socket, addr):
         """Handle individual client connections."""
         print(f"Client connected from {addr}")
+        state = ConnectionState()
 
         try:
             while self.running:
-                data = client_socket.recv(1024).decode('utf-8').strip()
-                if not data:
+                if not state.recv_from(client_socket):
+                    break
+
+                # Answer a whole pipeline with a single sendall, or one per
+                # OUTPUT_BUFFER_LIMIT of replies for very large ones
+                reply = bytearray()
+                try:
+                    while self._execute_pending(state, reply):
+                        client_socket.sendall(reply)
+                        reply.clear()
+                except ProtocolError as e:
+                    reply += f"-ERR Protocol error: {e}\r\n".encode('utf-8')
+                    client_socket.sendall(reply)
                     break
 
-                response = self._process_command(data)
-                client_socket.send(f"{response}\n".encode('utf-8'))
+                if reply:
+                    client_socket.sendall(reply)
 
         except (ConnectionResetError, BrokenPipeError):
             pass
@@ -97,78 +457,193 @@ class PyRedisServer:
             client_socket.close()
             print(f"Client {addr} disconnected")
 
-    def _process_command(self, command_str: str) -> str:
-        """Process a Redis command and return the response."""
+    def _execute_pending(self, state: ConnectionState, out: bytearray) -> bool:
+        """
+        Run the complete commands in a connection's buffer.
+
+        Replies are appended to ``out`` so that all commands received in
+        one read are answered with a single write. Stops once ``out``
+        reaches OUTPUT_BUFFER_LIMIT and returns True, as commands may be
+        left for after the replies are sent; returns False when the buffer
+        holds no complete command.
+        """
+        while len(out) < OUTPUT_BUFFER_LIMIT:
+            parts = self._next_command(state)
+            if parts is None:
+                return False
+
+            out += self._process_command(parts)
+        return True
+
+    def _next_command(self, state: ConnectionState) -> Optional[List[bytes]]:
+        """
+        Parse the next complete command from a connection's buffer.
+
+        Accepts RESP multi-bulk requests (a ``*N`` header followed by N
+        ``$L`` bulk strings) as well as newline-terminated inline commands.
+        Once a connection has sent a multi-bulk request, inline commands
+        are rejected. Returns None when the buffer does not hold a complete
+        command yet.
+
+        When hiredis is installed, a connection's input is handed to a
+        ``hiredis.Reader`` at its first multi-bulk request and parsed in C
+        from then on.
+        """
+        if state.reader is not None:
+            return self._next_reader_command(state)
+
+        buf = state.buf
+
+        while True:
+            if state.argc is None:
+                if state.pos >= state.end:
+                    return None
+
+                if buf[state.pos] != 0x2A:  # Not '*': inline command
+                    if state.multibulk:
+                        raise ProtocolError(f"expected '*', got '{chr(buf[state.pos])}'")
+                    newline = buf.find(b'\n', state.pos, state.end)
+                    if newline == -1:
+                        if state.end - state.pos > MAX_LINE_LEN:
+                            raise ProtocolError("too big inline request")
+                        return None
+
+                    # latin-1 round-trips arbitrary bytes through the str-based splitter
+                    line = buf[state.pos:newline].decode('latin-1')
+                    state.pos = newline + 1
+                    parts = self._parse_command(line)
+                    if parts:
+                        return [part.encode('latin-1') for part in parts]
+                    continue
+
+                state.multibulk = True
+                if hiredis is not None:
+                    state.reader = hiredis.Reader()
+                    state.reader.feed(buf, state.pos, state.end - state.pos)
+                    state.reader_fed = state.end - state.pos
+                    state.pos = state.end
+                    return self._next_reader_command(state)
+
+                crlf = buf.find(b'\r\n', state.pos, state.end)
+                if crlf == -1:
+                    if state.end - state.pos > MAX_LINE_LEN:
+                        raise ProtocolError("too big mbulk count string")
+                    return None
+
+                try:
+                    argc = int(buf[state.pos + 1:crlf])
+                except ValueError:
+                    raise ProtocolError("invalid multibulk length")
+                state.pos = crlf + 2
+                if argc <= 0:
+                    continue
+                state.argc = argc
+
+            while len(state.argv) < state.argc:
+                target = state.bulk_target
+                if target is not None:
+                    # Wait for the rest of the body and its trailing CRLF
+                    if state.bulk_written < len(target) or state.end - state.pos < 2:
+                        return None
+
+                    argv = state.argv
+                    if len(argv) >= 2 and argv[0].translate(self._UPPER) in DIRECT_BULK_COMMANDS:
+                        argv.append(target)
+                    else:
+                        # The argument may be hashed, so it has to be immutable
+                        argv.append(bytes(target))
+                    state.pos += 2
+                    state.expected_len = None
+                    state.bulk_target = None
+                    continue
+
+                if state.expected_len is None:
+                    crlf = buf.find(b'\r\n', state.pos, state.end)
+                    if crlf == -1:
+                        if state.end - state.pos > MAX_LINE_LEN:
+                            raise ProtocolError("too big bulk count string")
+                        return None
+
+                    if buf[state.pos] != 0x24:  # '$'
+                        raise ProtocolError(f"expected '$', got '{chr(buf[state.pos])}'")
+                    try:
+                        expected_len = int(buf[state.pos + 1:crlf])
+                    except ValueError:
+                        raise ProtocolError("invalid bulk length")
+                    if expected_len < 0 or expected_len > MAX_BULK_LEN:
+                        raise ProtocolError("invalid bulk length")
+                    state.expected_len = expected_len
+                    state.pos = crlf + 2
+
+                    if expected_len >= BULK_DIRECT_THRESHOLD:
+                        # Copy what has already arrived; later reads land directly in the target
+                        target = bytearray(expected_len)
+                        copied = min(state.end - state.pos, expected_len)
+                        target[:copied] = memoryview(buf)[state.pos:state.pos + copied]
+                        state.pos += copied
+                        state.bulk_target = target
+                        state.bulk_written = copied
+                        continue
+
+                start = state.pos
+                stop = start + state.expected_len
+                if state.end < stop + 2:
+                    return None
+
+                state.argv.append(bytes(memoryview(buf)[start:stop]))
+                state.pos = stop + 2
+                state.expected_len = None
+
+            parts = state.argv
+            state.argc = None
+            state.argv = []
+            return parts
+
+    def _next_reader_command(self, state: ConnectionState) -> Optional[List[bytes]]:
+        """
+        Take the next complete command parsed by a connection's hiredis reader.
+
+        hiredis keeps partial input to itself, so the line and bulk length
+        limits are enforced as one cap on the bytes fed to it since the last
+        complete command.
+        """
+        reader = state.reader
+        while True:
+            try:
+                parts = reader.gets()
+            except hiredis.ProtocolError:
+                raise ProtocolError("invalid multibulk request")
+
+            if parts is False:
+                if state.reader_fed > MAX_BULK_LEN + MAX_LINE_LEN:
+                    raise ProtocolError("invalid multibulk request")
+                return None
+            state.reader_fed = 0
+            if type(parts) is not list:
+                if parts is None:
+                    continue  # Null multi-bulk
+                raise ProtocolError("invalid multibulk request")
+            if parts:
+                return parts
+
+    def _process_command(self, parts: List[bytes]) -> bytes:
+        """Process a parsed Redis command and return the response."""
         try:
-            parts = self._parse_command(command_str)
             if not parts:
-                return "-ERR empty command"
-
-            cmd = parts[0].upper()
-            args = parts[1:]
-
-            # Route command to appropriate handler
-            if cmd == 'PING':
-                return self._cmd_ping(args)
-            elif cmd == 'SET':
-                return self._cmd_set(args)
-            elif cmd == 'GET':
-                return self._cmd_get(args)
-            elif cmd == 'DEL':
-                return self._cmd_del(args)
-            elif cmd == 'EXISTS':
-                return self._cmd_exists(args)
-            elif cmd == 'INCR':
-                return self._cmd_incr(args)
-            elif cmd == 'DECR':
-                return self._cmd_decr(args)
-            elif cmd == 'LPUSH':
-                return self._cmd_lpush(args)
-            elif cmd == 'RPUSH':
-                return self._cmd_rpush(args)
-            elif cmd == 'LPOP':
-                return self._cmd_lpop(args)
-            elif cmd == 'RPOP':
-                return self._cmd_rpop(args)
-            elif cmd == 'LLEN':
-                return self._cmd_llen(args)
-            elif cmd == 'LRANGE':
-                return self._cmd_lrange(args)
-            elif cmd == 'SADD':
-                return self._cmd_sadd(args)
-            elif cmd == 'SREM':
-                return self._cmd_srem(args)
-            elif cmd == 'SMEMBERS':
-                return self._cmd_smembers(args)
-            elif cmd == 'SCARD':
-                return self._cmd_scard(args)
-            elif cmd == 'SISMEMBER':
-                return self._cmd_sismember(args)
-            elif cmd == 'HSET':
-                return self._cmd_hset(args)
-            elif cmd == 'HGET':
-                return self._cmd_hget(args)
-            elif cmd == 'HDEL':
-                return self._cmd_hdel(args)
-            elif cmd == 'HKEYS':
-                return self._cmd_hkeys(args)
-            elif cmd == 'HVALS':
-                return self._cmd_hvals(args)
-            elif cmd == 'HGETALL':
-                return self._cmd_hgetall(args)
-            elif cmd == 'EXPIRE':
-                return self._cmd_expire(args)
-            elif cmd == 'TTL':
-                return self._cmd_ttl(args)
-            elif cmd == 'KEYS':
-                return self._cmd_keys(args)
-            elif cmd == 'FLUSHALL':
-                return self._cmd_flushall(args)
-            else:
-                return f"-ERR unknown command '{cmd}'"
+                return b"-ERR empty command\r\n"
+
+            cmd = parts[0].translate(self._UPPER)
+            handler = self._HANDLERS.get(cmd)
+            if handler is None:
+                # Truncate and flatten the echoed name like Redis, so it cannot break the reply framing
+                name = cmd[:128].replace(b'\r', b' ').replace(b'\n', b' ')
+                return b"-ERR unknown command '%s'\r\n" % name
+
+            # One clock read per command, shared by every expiry check it makes
+            return handler(self, parts[1:], time.monotonic())
 
         except Exception as e:
-            return f"-ERR {str(e)}"
+            return f"-ERR {str(e)}\r\n".encode('utf-8')
 
     def _parse_command(self, command_str: str) -> List[str]:
         """Parse a command string into parts, handling quoted strings."""
@@ -199,625 +674,735 @@ class PyRedisServer:
 
         return parts
 
-    def _is_expired(self, key: str) -> bool:
-        """Check if a key has expired."""
-        if key in self.expiry:
-            if time.time() > self.expiry[key]:
-                with self.lock:
-                    self.data.pop(key, None)
-                    self.expiry.pop(key, None)
+    def _shard(self, key: bytes) -> dict:
+        """Return the shard that owns a key."""
+        return self._shards[hash(key) & (NUM_SHARDS - 1)]
+
+    def _is_expired(self, key: bytes, now: float) -> bool:
+        """Check if a key has expired, deleting it if so."""
+        shard = self._shard(key)
+        expire_at = shard['expiry'].get(key)
+        if expire_at is None or expire_at > now:
+            return False
+
+        with shard['lock']:
+            # Re-check under the lock: a concurrent SET may have cleared the expiry
+            expiry = shard['expiry']
+            expire_at = expiry.get(key)
+            if expire_at is not None and expire_at <= now:
+                shard['data'].pop(key, None)
+                del expiry[key]
                 return True
         return False
 
+    def _expired_now(self, key: bytes, now: float) -> bool:
+        """
+        Check if a key has expired without deleting it.
+
+        Read-only commands use this to report an expired key as missing
+        without taking the shard lock; the key itself is removed by the
+        next write to it or by the sweeper.
+        """
+        expire_at = self._shard(key)['expiry'].get(key)
+        return expire_at is not None and expire_at <= now
+
     def _cleanup_expired_keys(self):
         """Background thread to clean up expired keys."""
         while self.running:
-            current_time = time.time()
-            expired_keys = []
-
-            with self.lock:
-                for key, expiry_time in self.expiry.items():
-                    if current_time > expiry_time:
-                        expired_keys.append(key)
-
-                for key in expired_keys:
-                    self.data.pop(key, None)
-                    self.expiry.pop(key, None)
-
-            time.sleep(1)  # Check every second
+            self._expiry_wakeup.clear()
+            delay = self._sweep_expired_keys()
+            self._expiry_wakeup.wait(delay)
+
+    def _sweep_expired_keys(self) -> Optional[float]:
+        """
+        Remove keys whose expiry time has passed.
+
+        Due entries are popped off each shard's expiry heap, so the cost
+        depends on how many keys actually expire rather than how many have
+        a TTL. Shards are swept one at a time under their own lock, so the
+        sweep never blocks the whole database. Returns the seconds until
+        the next expiry, or None if there is none.
+        """
+        next_expiry = None
+
+        for shard in self._shards:
+            heap = shard['heap']
+            if not heap:
+                continue
+
+            with shard['lock']:
+                data = shard['data']
+                expiry = shard['expiry']
+                current_time = time.monotonic()
+                while heap and heap[0][0] <= current_time:
+                    expire_at, key = heapq.heappop(heap)
+                    # Entries superseded by a later EXPIRE, SET or DEL no longer match
+                    if expiry.get(key) == expire_at:
+                        data.pop(key, None)
+                        del expiry[key]
+
+                if heap and (next_expiry is None or heap[0][0] < next_expiry):
+                    next_expiry = heap[0][0]
+
+        if next_expiry is None:
+            return None
+        return max(0.0, next_expiry - time.monotonic())
 
     # String Commands
-    def _cmd_ping(self, args: List[str]) -> str:
+    def _cmd_ping(self, args: List[bytes], now: float) -> bytes:
         """PING command - test connection."""
         if args:
-            return f"+{args[0]}"
-        return "+PONG"
+            return bulk_reply(args[0])
+        return RESP_PONG
 
-    def _cmd_set(self, args: List[str]) -> str:
+    def _cmd_set(self, args: List[bytes], now: float) -> bytes:
         """SET key value - set string value."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'set' command"
+            return RESP_ERR_WRONG_ARGS[b'set']
 
         key, value = args[0], args[1]
 
-        with self.lock:
-            self.data[key] = {'type': 'string', 'value': value}
+        shard = self._shard(key)
+        with shard['lock']:
+            shard['data'][key] = (TYPE_STR, value, None)
             # Remove any existing expiry
-            self.expiry.pop(key, None)
+            shard['expiry'].pop(key, None)
 
-        return "+OK"
+        return RESP_OK
 
-    def _cmd_get(self, args: List[str]) -> str:
+    def _cmd_get(self, args: List[bytes], now: float) -> bytes:
         """GET key - get string value."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'get' command"
+            return RESP_ERR_WRONG_ARGS[b'get']
 
         key = args[0]
 
-        if self._is_expired(key):
-            return "$-1"
-
-        with self.lock:
-            if key not in self.data:
-                return "$-1"
+        entry = None if self._expired_now(key, now) else self._shard(key)['data'].get(key)
+        if entry is None:
+            return RESP_NIL
 
-            data = self.data[key]
-            if data['type'] != 'string':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_STR:
+            return RESP_WRONGTYPE
 
-            return f"+{data['value']}"
+        return bulk_reply(entry[1])
 
-    def _cmd_del(self, args: List[str]) -> str:
+    def _cmd_del(self, args: List[bytes], now: float) -> bytes:
         """DEL key [key ...] - delete keys."""
         if not args:
-            return "-ERR wrong number of arguments for 'del' command"
+            return RESP_ERR_WRONG_ARGS[b'del']
 
         deleted = 0
-        with self.lock:
-            for key in args:
-                if key in self.data:
-                    del self.data[key]
-                    self.expiry.pop(key, None)
+        for key in args:
+            shard = self._shard(key)
+            with shard['lock']:
+                if key in shard['data']:
+                    del shard['data'][key]
+                    shard['expiry'].pop(key, None)
                     deleted += 1
 
-        return f":{deleted}"
+        return int_reply(deleted)
 
-    def _cmd_exists(self, args: List[str]) -> str:
+    def _cmd_exists(self, args: List[bytes], now: float) -> bytes:
         """EXISTS key [key ...] - check if keys exist."""
         if not args:
-            return "-ERR wrong number of arguments for 'exists' command"
+            return RESP_ERR_WRONG_ARGS[b'exists']
 
         count = 0
         for key in args:
-            if not self._is_expired(key) and key in self.data:
+            if not self._expired_now(key, now) and key in self._shard(key)['data']:
                 count += 1
 
-        return f":{count}"
+        return int_reply(count)
 
-    def _cmd_incr(self, args: List[str]) -> str:
+    def _cmd_incr(self, args: List[bytes], now: float) -> bytes:
         """INCR key - increment integer value."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'incr' command"
+            return RESP_ERR_WRONG_ARGS[b'incr']
 
         key = args[0]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'string', 'value': '1'}
-                return ":1"
+        shard = self._shard(key)
+        with shard['lock']:
+            data = shard['data']
+            entry = None if self._is_expired(key, now) else data.get(key)
+            if entry is None:
+                data[key] = (TYPE_STR, b'1', 1)
+                return RESP_ONE
 
-            data = self.data[key]
-            if data['type'] != 'string':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_STR:
+                return RESP_WRONGTYPE
 
-            try:
-                value = int(data['value'])
-                value += 1
-                data['value'] = str(value)
-                return f":{value}"
-            except ValueError:
-                return "-ERR value is not an integer or out of range"
-
-    def _cmd_decr(self, args: List[str]) -> str:
+            value = entry[2]
+            if value is None:
+                try:
+                    value = int(entry[1])
+                except ValueError:
+                    return RESP_NOT_INTEGER
+            value += 1
+            data[key] = (TYPE_STR, b'%d' % value, value)
+            return int_reply(value)
+
+    def _cmd_decr(self, args: List[bytes], now: float) -> bytes:
         """DECR key - decrement integer value."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'decr' command"
+            return RESP_ERR_WRONG_ARGS[b'decr']
 
         key = args[0]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'string', 'value': '-1'}
-                return ":-1"
+        shard = self._shard(key)
+        with shard['lock']:
+            data = shard['data']
+            entry = None if self._is_expired(key, now) else data.get(key)
+            if entry is None:
+                data[key] = (TYPE_STR, b'-1', -1)
+                return RESP_MINUS_ONE
 
-            data = self.data[key]
-            if data['type'] != 'string':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_STR:
+                return RESP_WRONGTYPE
 
-            try:
-                value = int(data['value'])
-                value -= 1
-                data['value'] = str(value)
-                return f":{value}"
-            except ValueError:
-                return "-ERR value is not an integer or out of range"
+            value = entry[2]
+            if value is None:
+                try:
+                    value = int(entry[1])
+                except ValueError:
+                    return RESP_NOT_INTEGER
+            value -= 1
+            data[key] = (TYPE_STR, b'%d' % value, value)
+            return int_reply(value)
 
     # List Commands
-    def _cmd_lpush(self, args: List[str]) -> str:
+    def _cmd_lpush(self, args: List[bytes], now: float) -> bytes:
         """LPUSH key element [element ...] - push to left of list."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'lpush' command"
+            return RESP_ERR_WRONG_ARGS[b'lpush']
 
         key = args[0]
         elements = args[1:]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'list', 'value': []}
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = None if self._is_expired(key, now) else shard['data'].get(key)
+            if entry is None:
+                entry = shard['data'][key] = (TYPE_LIST, deque())
 
-            data = self.data[key]
-            if data['type'] != 'list':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_LIST:
+                return RESP_WRONGTYPE
 
-            # Insert at beginning (left)
-            for element in reversed(elements):
-                data['value'].insert(0, element)
+            # Push each element onto the head in turn, so the last one ends up first
+            entry[1].extendleft(elements)
 
-            return f":{len(data['value'])}"
+            return int_reply(len(entry[1]))
 
-    def _cmd_rpush(self, args: List[str]) -> str:
+    def _cmd_rpush(self, args: List[bytes], now: float) -> bytes:
         """RPUSH key element [element ...] - push to right of list."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'rpush' command"
+            return RESP_ERR_WRONG_ARGS[b'rpush']
 
         key = args[0]
         elements = args[1:]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'list', 'value': []}
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = None if self._is_expired(key, now) else shard['data'].get(key)
+            if entry is None:
+                entry = shard['data'][key] = (TYPE_LIST, deque())
 
-            data = self.data[key]
-            if data['type'] != 'list':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_LIST:
+                return RESP_WRONGTYPE
 
             # Append to end (right)
-            data['value'].extend(elements)
+            entry[1].extend(elements)
 
-            return f":{len(data['value'])}"
+            return int_reply(len(entry[1]))
 
-    def _cmd_lpop(self, args: List[str]) -> str:
+    def _cmd_lpop(self, args: List[bytes], now: float) -> bytes:
         """LPOP key - pop from left of list."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'lpop' command"
+            return RESP_ERR_WRONG_ARGS[b'lpop']
 
         key = args[0]
 
-        if self._is_expired(key):
-            return "$-1"
+        if self._is_expired(key, now):
+            return RESP_NIL
 
-        with self.lock:
-            if key not in self.data:
-                return "$-1"
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = shard['data'].get(key)
+            if entry is None:
+                return RESP_NIL
 
-            data = self.data[key]
-            if data['type'] != 'list':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_LIST:
+                return RESP_WRONGTYPE
 
-            if not data['value']:
-                return "$-1"
+            if not entry[1]:
+                return RESP_NIL
 
-            element = data['value'].pop(0)
+            element = entry[1].popleft()
 
             # Clean up empty list
-            if not data['value']:
-                del self.data[key]
+            if not entry[1]:
+                del shard['data'][key]
 
-            return f"+{element}"
+            return bulk_reply(element)
 
-    def _cmd_rpop(self, args: List[str]) -> str:
+    def _cmd_rpop(self, args: List[bytes], now: float) -> bytes:
         """RPOP key - pop from right of list."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'rpop' command"
+            return RESP_ERR_WRONG_ARGS[b'rpop']
 
         key = args[0]
 
-        if self._is_expired(key):
-            return "$-1"
+        if self._is_expired(key, now):
+            return RESP_NIL
 
-        with self.lock:
-            if key not in self.data:
-                return "$-1"
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = shard['data'].get(key)
+            if entry is None:
+                return RESP_NIL
 
-            data = self.data[key]
-            if data['type'] != 'list':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_LIST:
+                return RESP_WRONGTYPE
 
-            if not data['value']:
-                return "$-1"
+            if not entry[1]:
+                return RESP_NIL
 
-            element = data['value'].pop()
+            element = entry[1].pop()
 
             # Clean up empty list
-            if not data['value']:
-                del self.data[key]
+            if not entry[1]:
+                del shard['data'][key]
 
-            return f"+{element}"
+            return bulk_reply(element)
 
-    def _cmd_llen(self, args: List[str]) -> str:
+    def _cmd_llen(self, args: List[bytes], now: float) -> bytes:
         """LLEN key - get length of list."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'llen' command"
+            return RESP_ERR_WRONG_ARGS[b'llen']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        entry = None if self._expired_now(key, now) else self._shard(key)['data'].get(key)
+        if entry is None:
+            return RESP_ZERO
 
-        data = self.data[key]
-        if data['type'] != 'list':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_LIST:
+            return RESP_WRONGTYPE
 
-        return f":{len(data['value'])}"
+        return int_reply(len(entry[1]))
 
-    def _cmd_lrange(self, args: List[str]) -> str:
+    def _cmd_lrange(self, args: List[bytes], now: float) -> bytes:
         """LRANGE key start stop - get range of list elements."""
         if len(args) != 3:
-            return "-ERR wrong number of arguments for 'lrange' command"
+            return RESP_ERR_WRONG_ARGS[b'lrange']
 
         key = args[0]
         try:
             start = int(args[1])
             stop = int(args[2])
         except ValueError:
-            return "-ERR value is not an integer or out of range"
-
-        if self._is_expired(key) or key not in self.data:
-            return "*0"
+            return RESP_NOT_INTEGER
 
-        data = self.data[key]
-        if data['type'] != 'list':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        shard = self._shard(key)
+        entry = None if self._expired_now(key, now) else shard['data'].get(key)
+        if entry is None:
+            return RESP_EMPTY_ARRAY
 
-        lst = data['value']
-        length = len(lst)
+        if entry[0] != TYPE_LIST:
+            return RESP_WRONGTYPE
 
-        # Handle negative indices
-        if start < 0:
-            start = max(0, length + start)
-        if stop < 0:
-            stop = length + stop
+        lst = entry[1]
+        # Encode under the lock
+        with shard['lock']:
+            n = len(lst)
 
-        # Clamp to valid range
-        start = max(0, min(start, length - 1))
-        stop = min(stop, length - 1)
+            # Normalize negative indices and clamp to an exclusive stop
+            start = max(0, start + n) if start < 0 else min(start, n)
+            stop = min((stop + n if stop < 0 else stop) + 1, n)
 
-        if start > stop or start >= length:
-            return "*0"
+            if start >= stop:
+                return RESP_EMPTY_ARRAY
 
-        result = lst[start:stop + 1]
-        response = f"*{len(result)}"
-        for item in result:
-            response += f"\n+{item}"
-
-        return response
+            if start == 0 and stop == n:
+                return array_reply(lst, n)
+            return array_reply(islice(lst, start, stop), stop - start)
 
     # Set Commands
-    def _cmd_sadd(self, args: List[str]) -> str:
+    def _cmd_sadd(self, args: List[bytes], now: float) -> bytes:
         """SADD key member [member ...] - add members to set."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'sadd' command"
+            return RESP_ERR_WRONG_ARGS[b'sadd']
 
         key = args[0]
         members = args[1:]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'set', 'value': set()}
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = None if self._is_expired(key, now) else shard['data'].get(key)
+            if entry is None:
+                entry = shard['data'][key] = (TYPE_SET, set())
 
-            data = self.data[key]
-            if data['type'] != 'set':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_SET:
+                return RESP_WRONGTYPE
 
-            added = 0
-            for member in members:
-                if member not in data['value']:
-                    data['value'].add(member)
-                    added += 1
+            # Let the set count the new members instead of testing each one
+            values = entry[1]
+            size = len(values)
+            values.update(members)
 
-            return f":{added}"
+            return int_reply(len(values) - size)
 
-    def _cmd_srem(self, args: List[str]) -> str:
+    def _cmd_srem(self, args: List[bytes], now: float) -> bytes:
         """SREM key member [member ...] - remove members from set."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'srem' command"
+            return RESP_ERR_WRONG_ARGS[b'srem']
 
         key = args[0]
         members = args[1:]
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        if self._is_expired(key, now):
+            return RESP_ZERO
+
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = shard['data'].get(key)
+            if entry is None:
+                return RESP_ZERO
 
-        with self.lock:
-            data = self.data[key]
-            if data['type'] != 'set':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_SET:
+                return RESP_WRONGTYPE
 
-            removed = 0
-            for member in members:
-                if member in data['value']:
-                    data['value'].remove(member)
-                    removed += 1
+            values = entry[1]
+            size = len(values)
+            values.difference_update(members)
 
             # Clean up empty set
-            if not data['value']:
-                del self.data[key]
+            if not values:
+                del shard['data'][key]
 
-            return f":{removed}"
+            return int_reply(size - len(values))
 
-    def _cmd_smembers(self, args: List[str]) -> str:
+    def _cmd_smembers(self, args: List[bytes], now: float) -> bytes:
         """SMEMBERS key - get all members of set."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'smembers' command"
+            return RESP_ERR_WRONG_ARGS[b'smembers']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return "*0"
+        shard = self._shard(key)
+        entry = None if self._expired_now(key, now) else shard['data'].get(key)
+        if entry is None:
+            return RESP_EMPTY_ARRAY
 
-        data = self.data[key]
-        if data['type'] != 'set':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_SET:
+            return RESP_WRONGTYPE
 
-        members = list(data['value'])
-        response = f"*{len(members)}"
-        for member in members:
-            response += f"\n+{member}"
+        members = entry[1]
+        # Encode under the lock
+        with shard['lock']:
+            return array_reply(members, len(members))
 
-        return response
-
-    def _cmd_scard(self, args: List[str]) -> str:
+    def _cmd_scard(self, args: List[bytes], now: float) -> bytes:
         """SCARD key - get cardinality (size) of set."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'scard' command"
+            return RESP_ERR_WRONG_ARGS[b'scard']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        entry = None if self._expired_now(key, now) else self._shard(key)['data'].get(key)
+        if entry is None:
+            return RESP_ZERO
 
-        data = self.data[key]
-        if data['type'] != 'set':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_SET:
+            return RESP_WRONGTYPE
 
-        return f":{len(data['value'])}"
+        return int_reply(len(entry[1]))
 
-    def _cmd_sismember(self, args: List[str]) -> str:
+    def _cmd_sismember(self, args: List[bytes], now: float) -> bytes:
         """SISMEMBER key member - check if member exists in set."""
         if len(args) != 2:
-            return "-ERR wrong number of arguments for 'sismember' command"
+            return RESP_ERR_WRONG_ARGS[b'sismember']
 
         key = args[0]
         member = args[1]
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        entry = None if self._expired_now(key, now) else self._shard(key)['data'].get(key)
+        if entry is None:
+            return RESP_ZERO
 
-        data = self.data[key]
-        if data['type'] != 'set':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_SET:
+            return RESP_WRONGTYPE
 
-        return ":1" if member in data['value'] else ":0"
+        return RESP_ONE if member in entry[1] else RESP_ZERO
 
     # Hash Commands
-    def _cmd_hset(self, args: List[str]) -> str:
+    def _cmd_hset(self, args: List[bytes], now: float) -> bytes:
         """HSET key field value [field value ...] - set hash fields."""
         if len(args) < 3 or len(args) % 2 == 0:
-            return "-ERR wrong number of arguments for 'hset' command"
+            return RESP_ERR_WRONG_ARGS[b'hset']
 
         key = args[0]
 
-        with self.lock:
-            if self._is_expired(key) or key not in self.data:
-                self.data[key] = {'type': 'hash', 'value': {}}
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = None if self._is_expired(key, now) else shard['data'].get(key)
+            if entry is None:
+                entry = shard['data'][key] = (TYPE_HASH, {})
 
-            data = self.data[key]
-            if data['type'] != 'hash':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_HASH:
+                return RESP_WRONGTYPE
 
-            added = 0
-            for i in range(1, len(args), 2):
-                field = args[i]
-                value = args[i + 1]
-                if field not in data['value']:
-                    added += 1
-                data['value'][field] = value
+            # Fields are at odd positions and values at even ones
+            fields = entry[1]
+            size = len(fields)
+            fields.update(zip(args[1::2], args[2::2]))
 
-            return f":{added}"
+            return int_reply(len(fields) - size)
 
-    def _cmd_hget(self, args: List[str]) -> str:
+    def _cmd_hget(self, args: List[bytes], now: float) -> bytes:
         """HGET key field - get hash field value."""
         if len(args) != 2:
-            return "-ERR wrong number of arguments for 'hget' command"
+            return RESP_ERR_WRONG_ARGS[b'hget']
 
         key = args[0]
         field = args[1]
 
-        if self._is_expired(key) or key not in self.data:
-            return "$-1"
+        entry = None if self._expired_now(key, now) else self._shard(key)['data'].get(key)
+        if entry is None:
+            return RESP_NIL
 
-        data = self.data[key]
-        if data['type'] != 'hash':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_HASH:
+            return RESP_WRONGTYPE
 
-        if field not in data['value']:
-            return "$-1"
+        value = entry[1].get(field)
+        if value is None:
+            return RESP_NIL
 
-        return f"+{data['value'][field]}"
+        return bulk_reply(value)
 
-    def _cmd_hdel(self, args: List[str]) -> str:
+    def _cmd_hdel(self, args: List[bytes], now: float) -> bytes:
         """HDEL key field [field ...] - delete hash fields."""
         if len(args) < 2:
-            return "-ERR wrong number of arguments for 'hdel' command"
+            return RESP_ERR_WRONG_ARGS[b'hdel']
 
         key = args[0]
         fields = args[1:]
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        if self._is_expired(key, now):
+            return RESP_ZERO
+
+        shard = self._shard(key)
+        with shard['lock']:
+            entry = shard['data'].get(key)
+            if entry is None:
+                return RESP_ZERO
 
-        with self.lock:
-            data = self.data[key]
-            if data['type'] != 'hash':
-                return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+            if entry[0] != TYPE_HASH:
+                return RESP_WRONGTYPE
 
-            deleted = 0
+            values = entry[1]
+            size = len(values)
             for field in fields:
-                if field in data['value']:
-                    del data['value'][field]
-                    deleted += 1
+                values.pop(field, None)
 
             # Clean up empty hash
-            if not data['value']:
-                del self.data[key]
+            if not values:
+                del shard['data'][key]
 
-            return f":{deleted}"
+            return int_reply(size - len(values))
 
-    def _cmd_hkeys(self, args: List[str]) -> str:
+    def _cmd_hkeys(self, args: List[bytes], now: float) -> bytes:
         """HKEYS key - get all hash field names."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'hkeys' command"
+            return RESP_ERR_WRONG_ARGS[b'hkeys']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return "*0"
-
-        data = self.data[key]
-        if data['type'] != 'hash':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        shard = self._shard(key)
+        entry = None if self._expired_now(key, now) else shard['data'].get(key)
+        if entry is None:
+            return RESP_EMPTY_ARRAY
 
-        keys = list(data['value'].keys())
-        response = f"*{len(keys)}"
-        for k in keys:
-            response += f"\n+{k}"
+        if entry[0] != TYPE_HASH:
+            return RESP_WRONGTYPE
 
-        return response
+        fields = entry[1]
+        # Encode under the lock
+        with shard['lock']:
+            return array_reply(fields.keys(), len(fields))
 
-    def _cmd_hvals(self, args: List[str]) -> str:
+    def _cmd_hvals(self, args: List[bytes], now: float) -> bytes:
         """HVALS key - get all hash field values."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'hvals' command"
+            return RESP_ERR_WRONG_ARGS[b'hvals']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return "*0"
+        shard = self._shard(key)
+        entry = None if self._expired_now(key, now) else shard['data'].get(key)
+        if entry is None:
+            return RESP_EMPTY_ARRAY
 
-        data = self.data[key]
-        if data['type'] != 'hash':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_HASH:
+            return RESP_WRONGTYPE
 
-        values = list(data['value'].values())
-        response = f"*{len(values)}"
-        for v in values:
-            response += f"\n+{v}"
-
-        return response
+        fields = entry[1]
+        # Encode under the lock
+        with shard['lock']:
+            return array_reply(fields.values(), len(fields))
 
-    def _cmd_hgetall(self, args: List[str]) -> str:
+    def _cmd_hgetall(self, args: List[bytes], now: float) -> bytes:
         """HGETALL key - get all hash fields and values."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'hgetall' command"
+            return RESP_ERR_WRONG_ARGS[b'hgetall']
 
         key = args[0]
 
-        if self._is_expired(key) or key not in self.data:
-            return "*0"
+        shard = self._shard(key)
+        entry = None if self._expired_now(key, now) else shard['data'].get(key)
+        if entry is None:
+            return RESP_EMPTY_ARRAY
 
-        data = self.data[key]
-        if data['type'] != 'hash':
-            return "-ERR WRONGTYPE Operation against a key holding the wrong kind of value"
+        if entry[0] != TYPE_HASH:
+            return RESP_WRONGTYPE
 
-        items = []
-        for k, v in data['value'].items():
-            items.extend([k, v])
-
-        response = f"*{len(items)}"
-        for item in items:
-            response += f"\n+{item}"
-
-        return response
+        fields = entry[1]
+        # Encode under the lock
+        with shard['lock']:
+            return array_reply(chain.from_iterable(fields.items()), 2 * len(fields))
 
     # Expiration Commands
-    def _cmd_expire(self, args: List[str]) -> str:
+    def _cmd_expire(self, args: List[bytes], now: float) -> bytes:
         """EXPIRE key seconds - set key expiration."""
         if len(args) != 2:
-            return "-ERR wrong number of arguments for 'expire' command"
+            return RESP_ERR_WRONG_ARGS[b'expire']
 
         key = args[0]
         try:
             seconds = int(args[1])
         except ValueError:
-            return "-ERR value is not an integer or out of range"
+            return RESP_NOT_INTEGER
 
-        if self._is_expired(key) or key not in self.data:
-            return ":0"
+        if self._is_expired(key, now):
+            return RESP_ZERO
 
-        with self.lock:
-            self.expiry[key] = time.time() + seconds
+        shard = self._shard(key)
+        with shard['lock']:
+            if key not in shard['data']:
+                return RESP_ZERO
+
+            expire_at = now + seconds
+            expiry = shard['expiry']
+            expiry[key] = expire_at
+
+            heap = shard['heap']
+            if len(heap) > 2 * len(expiry) + 64:
+                # Too many stale entries: rebuild the heap from the live expiry times
+                heap[:] = [(ts, k) for k, ts in expiry.items()]
+                heapq.heapify(heap)
+            else:
+                heapq.heappush(heap, (expire_at, key))
 
-        return ":1"
+            if heap[0] == (expire_at, key):
+                self._expiry_wakeup.set()
 
-    def _cmd_ttl(self, args: List[str]) -> str:
+        return RESP_ONE
+
+    def _cmd_ttl(self, args: List[bytes], now: float) -> bytes:
         """TTL key - get key time to live."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'ttl' command"
+            return RESP_ERR_WRONG_ARGS[b'ttl']
 
         key = args[0]
 
-        if self._is_expired(key):
-            return ":-2"
+        if self._expired_now(key, now):
+            return RESP_MINUS_TWO
 
-        if key not in self.data:
-            return ":-2"
+        shard = self._shard(key)
+        if key not in shard['data']:
+            return RESP_MINUS_TWO
 
-        if key not in self.expiry:
-            return ":-1"
+        expire_at = shard['expiry'].get(key)
+        if expire_at is None:
+            return RESP_MINUS_ONE
 
-        ttl = int(self.expiry[key] - time.time())
-        return f":{max(0, ttl)}"
+        ttl = int(expire_at - now)
+        return int_reply(max(0, ttl))
 
     # General Commands
-    def _cmd_keys(self, args: List[str]) -> str:
+    def _cmd_keys(self, args: List[bytes], now: float) -> bytes:
         """KEYS pattern - find keys matching pattern."""
         if len(args) != 1:
-            return "-ERR wrong number of arguments for 'keys' command"
+            return RESP_ERR_WRONG_ARGS[b'keys']
 
         pattern = args[0]
 
-        # Convert Redis pattern to regex
-        regex_pattern = pattern.replace('*', '.*').replace('?', '.')
-        regex = re.compile(f'^{regex_pattern}$')
+        if not any(c in pattern for c in b'*?[\\'):
+            # No wildcards: at most one key can match
+            candidates = [pattern] if pattern in self._shard(pattern)['data'] else []
+        else:
+            # Snapshot each shard without locking; like Redis, KEYS may be slightly stale
+            candidates = []
+            for shard in self._shards:
+                candidates.extend(shard['data'])
 
-        matches = []
-        for key in list(self.data.keys()):
-            if not self._is_expired(key) and regex.match(key):
-                matches.append(key)
+            if pattern != b'*':
+                candidates = filter(compile_glob(pattern).match, candidates)
 
-        response = f"*{len(matches)}"
-        for match in matches:
-            response += f"\n+{match}"
+        matches = [key for key in candidates if not self._expired_now(key, now)]
 
-        return response
+        return array_reply(matches, len(matches))
 
-    def _cmd_flushall(self, args: List[str]) -> str:
+    def _cmd_flushall(self, args: List[bytes], now: float) -> bytes:
         """FLUSHALL - clear all data."""
-        with self.lock:
-            self.data.clear()
-            self.expiry.clear()
-
-        return "+OK"
+        # Take every shard lock in a fixed order so concurrent FLUSHALLs cannot deadlock
+        for shard in self._shards:
+            shard['lock'].acquire()
+        try:
+            for shard in self._shards:
+                shard['data'].clear()
+                shard['expiry'].clear()
+                shard['heap'].clear()
+        finally:
+            for shard in reversed(self._shards):
+                shard['lock'].release()
+
+        return RESP_OK
+
+    # ASCII-only uppercase table for command names
+    _UPPER = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+    # Command name -> handler, called as handler(self, args, now)
+    _HANDLERS = {
+        b'PING': _cmd_ping,
+        b'SET': _cmd_set,
+        b'GET': _cmd_get,
+        b'DEL': _cmd_del,
+        b'EXISTS': _cmd_exists,
+        b'INCR': _cmd_incr,
+        b'DECR': _cmd_decr,
+        b'LPUSH': _cmd_lpush,
+        b'RPUSH': _cmd_rpush,
+        b'LPOP': _cmd_lpop,
+        b'RPOP': _cmd_rpop,
+        b'LLEN': _cmd_llen,
+        b'LRANGE': _cmd_lrange,
+        b'SADD': _cmd_sadd,
+        b'SREM': _cmd_srem,
+        b'SMEMBERS': _cmd_smembers,
+        b'SCARD': _cmd_scard,
+        b'SISMEMBER': _cmd_sismember,
+        b'HSET': _cmd_hset,
+        b'HGET': _cmd_hget,
+        b'HDEL': _cmd_hdel,
+        b'HKEYS': _cmd_hkeys,
+        b'HVALS': _cmd_hvals,
+        b'HGETALL': _cmd_hgetall,
+        b'EXPIRE': _cmd_expire,
+        b'TTL': _cmd_ttl,
+        b'KEYS': _cmd_keys,
+        b'FLUSHALL': _cmd_flushall,
+    }
 
 
 class PyRedisClient:
@@ -931,6 +1516,8 @@ def main():
     parser.add_argument('--host', default='localhost', help='Host to bind to (default: localhost)')
     parser.add_argument('--port', type=int, default=6379, help='Port to bind to (default: 6379)')
     parser.add_argument('--demo', action='store_true', help='Run demo instead of server')
+    parser.add_argument('--threaded', action='store_true',
+                        help='Serve each client from its own thread instead of the event loop')
 
     args = parser.parse_args()
 
@@ -940,7 +1527,7 @@ def main():
         print(f"Starting PyRedis server on {args.host}:{args.port}")
         print("Press Ctrl+C to stop the server")
 
-        server = PyRedisServer(host=args.host, port=args.port)
+        server = PyRedisServer(host=args.host, port=args.port, threaded=args.threaded)
         try:
             server.start()
         except KeyboardInterrupt: